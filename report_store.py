@@ -0,0 +1,395 @@
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Numeric factors extracted from each agent section:
+# (section, factor, field holding the value, field holding the category)
+FACTOR_FIELDS = [
+    ("carbon_impact", "carbon_footprint", "carbon_footprint", None),
+    ("carbon_impact", "carbon_rating", "rating", None),
+    ("cost_analysis", "estimated_price_per_unit", "estimated_price_per_unit", "relative_cost"),
+    ("durability", "lifespan_years", "lifespan_years", "maintenance"),
+]
+FACTORS = [factor for _, factor, _, _ in FACTOR_FIELDS]
+
+# Column layout of the on-disk store. Every string column is dictionary
+# encoded: the .bin file holds integer codes into meta.json's dictionaries.
+COLUMNS = {
+    "city": "int32",
+    "country": "int16",
+    "material": "int32",
+    "factor": "int8",
+    "value": "float32",
+    "category": "int16",
+}
+DICTIONARY_COLUMNS = ["city", "country", "material", "category"]
+
+# Each candidate number is matched together with any letters glued to its
+# front, starting at a word boundary (never inside a word or a thousands
+# group). Glued letters are only allowed when they are a currency marker
+# ("Rs.", "PKR", "USD") or an abbreviation ending in a dot ("approx."), so the
+# "2" in "CO2" or the "3" in "m3" is skipped as a whole token.
+_UNSIGNED = r"(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?(?:[eE][-+]?\d+)?"
+_NUMBER_RE = re.compile(rf"(?<![\w.,])([^\W\d_]*\.?)(-?{_UNSIGNED})")
+_RANGE_TAIL_RE = re.compile(rf"\s*(?:-|–|to)\s*({_UNSIGNED})")
+# Digits running on past the number ("1.2.3", "12,34") make it unreadable
+_MALFORMED_TAIL_RE = re.compile(r"[.,]\d")
+_CURRENCIES = {"rs", "pkr", "inr", "usd", "us$", "eur", "gbp", "aed", "sar"}
+
+
+def _to_float(token):
+    return float(token.replace(",", ""))
+
+
+def parse_number(value) -> float:
+    """
+    Pull a number out of a free-form agent value such as "0.9 kg CO2/kg",
+    "Rs.15-20 per brick" or 50. The first standalone number is the value; if
+    it starts a range, the range's midpoint is used instead. Anything without
+    a number, or whose first number is malformed, becomes NaN.
+    """
+    if isinstance(value, bool) or value is None:
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value)
+    for match in _NUMBER_RE.finditer(text):
+        prefix, number = match.groups()
+        if prefix and not prefix.endswith(".") and prefix.lower() not in _CURRENCIES:
+            continue
+
+        end = match.end()
+        tail = _RANGE_TAIL_RE.match(text, end)
+        if tail:
+            end = tail.end()
+        if _MALFORMED_TAIL_RE.match(text, end):
+            return float("nan")
+
+        if tail:
+            return (_to_float(number) + _to_float(tail.group(1))) / 2
+        return _to_float(number)
+    return float("nan")
+
+
+def _clean(value):
+    """Collapse whitespace in a dictionary value; None or blank becomes None"""
+    if value is None:
+        return None
+    return " ".join(str(value).split()) or None
+
+
+def flatten_report(report: dict):
+    """
+    Turn one evaluation report into long-format rows of
+    (city, country, material, factor, value, category).
+
+    Sections that errored out (an {"error": ...} dict from an agent) or
+    entries that are not dicts are skipped. A missing, null or blank city,
+    country, material or category (the carbon factors have none) is None.
+    """
+    location = report.get("location") or {}
+    city = _clean(location.get("city"))
+    country = _clean(location.get("country"))
+
+    for section, factor, value_field, category_field in FACTOR_FIELDS:
+        entries = report.get(section)
+        if not isinstance(entries, dict):
+            continue
+        for material, data in entries.items():
+            if not isinstance(data, dict) or value_field not in data:
+                continue
+            category = _clean(data.get(category_field)) if category_field else None
+            material = _clean(material)
+            yield (
+                city,
+                country,
+                material and material.lower(),
+                factor,
+                parse_number(data[value_field]),
+                category and category.lower(),
+            )
+
+
+def _read_meta(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        return json.load(f)
+
+
+class ReportStore:
+    """
+    Append-only columnar store for evaluation reports.
+
+    Rows are buffered in memory and written out every `chunk_rows` rows, so
+    arbitrarily many reports can be added without holding them all at once.
+    Opening an existing store continues appending to it.
+
+    Dictionary values are matched case-insensitively, so "Pakistan" and
+    "pakistan" share one code, stored under the first spelling seen.
+    """
+
+    def __init__(self, path: str, chunk_rows: int = 65536):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        os.makedirs(path, exist_ok=True)
+
+        if os.path.exists(os.path.join(path, "meta.json")):
+            meta = _read_meta(path)
+            if meta["columns"] != COLUMNS or meta["factors"] != FACTORS:
+                raise ValueError(
+                    f"Report store at {path} was written with a different column "
+                    f"or factor layout; write to a new store instead"
+                )
+            self.rows = meta["rows"]
+            self.dictionaries = meta["dictionaries"]
+        else:
+            self.rows = 0
+            self.dictionaries = {name: [] for name in DICTIONARY_COLUMNS}
+
+        self._codes = {name: {} for name in self.dictionaries}
+        for name, values in self.dictionaries.items():
+            for code, value in enumerate(values):
+                self._codes[name].setdefault(value.casefold(), code)
+        self._buffer = {name: [] for name in COLUMNS}
+        self._files = {
+            name: open(os.path.join(path, f"{name}.bin"), "ab") for name in COLUMNS
+        }
+        # Drop any partial chunk left behind by a write that never reached meta.json
+        for name, dtype in COLUMNS.items():
+            self._files[name].truncate(self.rows * np.dtype(dtype).itemsize)
+
+    def _encode(self, name, value):
+        # Missing values are stored as -1, which pandas reads back as NaN
+        if value is None:
+            return -1
+        codes = self._codes[name]
+        key = value.casefold()
+        if key not in codes:
+            code = len(self.dictionaries[name])
+            if code > np.iinfo(COLUMNS[name]).max:
+                raise ValueError(f"Too many distinct {name} values for {COLUMNS[name]}")
+            codes[key] = code
+            self.dictionaries[name].append(value)
+        return codes[key]
+
+    def append(self, report: dict):
+        """Flatten a report and add its rows to the store"""
+        # Encode the whole report before touching the buffers, so an error
+        # partway through cannot leave the columns with different lengths
+        rows = [
+            (
+                self._encode("city", city),
+                self._encode("country", country),
+                self._encode("material", material),
+                FACTORS.index(factor),
+                value,
+                self._encode("category", category),
+            )
+            for city, country, material, factor, value, category in flatten_report(report)
+        ]
+        buffer = self._buffer
+        for name, column in zip(COLUMNS, zip(*rows)):
+            buffer[name].extend(column)
+
+        if len(buffer["value"]) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows to disk and update meta.json"""
+        pending = len(self._buffer["value"])
+        if pending:
+            for name, dtype in COLUMNS.items():
+                np.asarray(self._buffer[name], dtype=dtype).tofile(self._files[name])
+                self._files[name].flush()
+                self._buffer[name] = []
+            self.rows += pending
+
+        meta = {
+            "rows": self.rows,
+            "columns": COLUMNS,
+            "factors": FACTORS,
+            "dictionaries": self.dictionaries,
+        }
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _codes_for(dictionary, wanted):
+    """
+    Codes of every dictionary entry matching `wanted`, normalised the way
+    values are stored: whitespace collapsed and compared with casefold()
+    """
+    if isinstance(wanted, str):
+        wanted = [wanted]
+    wanted = {" ".join(w.split()).casefold() for w in wanted}
+    return [code for code, value in enumerate(dictionary) if value.casefold() in wanted]
+
+
+def load_reports(path: str, country=None, material=None, city=None, factor=None) -> pd.DataFrame:
+    """
+    Load a report store as a long-format DataFrame with categorical
+    city/country/material/factor/category columns.
+
+    Each filter takes a name or a list of names. Columns are memory-mapped,
+    so filtering only reads the code columns it needs; other columns are
+    read just for the matching rows.
+    """
+    meta = _read_meta(path)
+    rows = meta["rows"]
+    dictionaries = dict(meta["dictionaries"], factor=meta["factors"])
+    columns = {
+        name: np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+        if rows else np.empty(0, dtype=dtype)
+        for name, dtype in meta["columns"].items()
+    }
+
+    mask = None
+    for name, wanted in (("country", country), ("material", material), ("city", city), ("factor", factor)):
+        if wanted is None:
+            continue
+        selected = np.isin(columns[name], _codes_for(dictionaries[name], wanted))
+        mask = selected if mask is None else mask & selected
+
+    index = slice(None) if mask is None else np.flatnonzero(mask)
+
+    data = {}
+    for name in COLUMNS:
+        values = np.asarray(columns[name][index])
+        if name in dictionaries:
+            data[name] = pd.Categorical.from_codes(values, categories=dictionaries[name])
+        else:
+            data[name] = values
+    return pd.DataFrame(data)
+
+
+def _synthetic_report(rng):
+    """Build a report shaped like MaterialSelectorOrchestrator's output"""
+    materials = rng.sample(["brick", "concrete", "steel", "wood", "glass", "aluminum",
+                            "bamboo", "stone", "clay", "adobe"], 6)
+    levels = ["low", "medium", "high"]
+    country = rng.choice(["Pakistan", "India", "Kenya", "Brazil", "Germany", "Japan"])
+    return {
+        "location": {"city": f"City {rng.randrange(500)}", "country": country},
+        "availability": {"easy_to_get": materials[:3], "limited": materials[3:5],
+                         "import_only": materials[5:]},
+        "carbon_impact": {
+            m: {"carbon_footprint": f"{rng.uniform(0.1, 12):.2f} kg CO2/kg",
+                "rating": rng.randint(1, 10), "notes": "Moderate embodied energy from production."}
+            for m in materials
+        },
+        "cost_analysis": {
+            m: {"relative_cost": rng.choice(levels),
+                "estimated_price_per_unit": f"${rng.randint(1, 50)}-{rng.randint(51, 120)} per unit",
+                "notes": "Price depends on transport distance and local supply."}
+            for m in materials
+        },
+        "durability": {
+            m: {"lifespan_years": rng.randint(20, 120), "maintenance": rng.choice(levels),
+                "notes": "Performs well with periodic inspection."}
+            for m in materials
+        },
+        "recommendation": "Selected Material: brick\nReasoning: Locally abundant and durable.",
+    }
+
+
+def _measure(label, func):
+    """
+    Run `func` twice: once untraced for the timing, since tracemalloc slows
+    allocation-heavy code far more than numpy code, and once under
+    tracemalloc for the peak memory.
+    """
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<42}{elapsed:>9.2f} s{peak / 2**20:>12.1f} MiB peak")
+    return result
+
+
+def benchmark(n_reports: int = 100_000):
+    """
+    Compare scanning JSON reports against the columnar store: write time,
+    on-disk size, and time/peak memory to filter by country and material.
+    """
+    workdir = tempfile.mkdtemp(prefix="report_store_bench_")
+    json_path = os.path.join(workdir, "reports.jsonl")
+    store_path = os.path.join(workdir, "store")
+
+    try:
+        rng = random.Random(0)
+        with open(json_path, "w") as f:
+            for _ in range(n_reports):
+                f.write(json.dumps(_synthetic_report(rng)) + "\n")
+
+        print(f"Benchmark with {n_reports:,} reports")
+        print("-" * 72)
+
+        def write_store():
+            shutil.rmtree(store_path, ignore_errors=True)
+            with ReportStore(store_path) as store, open(json_path) as f:
+                for line in f:
+                    store.append(json.loads(line))
+
+        _measure("write store (streaming from JSON lines)", write_store)
+
+        def scan_json(country, material):
+            rows = []
+            with open(json_path) as f:
+                for line in f:
+                    report = json.loads(line)
+                    if report["location"]["country"] != country:
+                        continue
+                    rows.extend(r for r in flatten_report(report) if r[2] == material)
+            return rows
+
+        def load_json_all():
+            with open(json_path) as f:
+                return [json.loads(line) for line in f]
+
+        _measure("JSON: load all reports into memory", load_json_all)
+        _measure("JSON: country=Kenya, material=steel", lambda: scan_json("Kenya", "steel"))
+        _measure("store: load all rows", lambda: load_reports(store_path))
+        frame = _measure("store: country=Kenya, material=steel",
+                         lambda: load_reports(store_path, country="Kenya", material="steel"))
+
+        json_size = os.path.getsize(json_path)
+        store_size = sum(os.path.getsize(os.path.join(store_path, name))
+                         for name in os.listdir(store_path))
+        print("-" * 72)
+        print(f"Matching rows: {len(frame):,}")
+        print(f"On disk: JSON lines {json_size / 2**20:.1f} MiB, store {store_size / 2**20:.1f} MiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the columnar report store")
+    parser.add_argument("--reports", type=int, default=100_000)
+    benchmark(parser.parse_args().reports)
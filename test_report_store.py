@@ -0,0 +1,229 @@
+import json
+import math
+import os
+
+import pandas as pd
+import pytest
+
+from report_store import COLUMNS, ReportStore, flatten_report, load_reports, parse_number
+
+
+def make_report(city="Lahore", country="Pakistan", materials=("brick", "steel")):
+    return {
+        "location": {"city": city, "country": country},
+        "availability": {"easy_to_get": list(materials), "limited": [], "import_only": []},
+        "carbon_impact": {
+            m: {"carbon_footprint": "0.24 kg CO2e/kg", "rating": 7, "notes": "Fired locally"}
+            for m in materials
+        },
+        "cost_analysis": {
+            m: {"relative_cost": "Low", "estimated_price_per_unit": "PKR 12-18 per unit",
+                "notes": "Cheap to transport"}
+            for m in materials
+        },
+        "durability": {
+            m: {"lifespan_years": "50-100 years", "maintenance": "medium", "notes": "Robust"}
+            for m in materials
+        },
+        "recommendation": "Selected Material: brick",
+    }
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("0.9 kg CO2/kg", 0.9),
+    ("CO2e: 0.9 kg/kg", 0.9),
+    ("m3: 250", 250.0),
+    ("PKR 1,500 per m3, 2-3x brick", 1500.0),
+    ("$5-7 per brick", 6.0),
+    ("50 to 100 years", 75.0),
+    ("40–60", 50.0),
+    ("Rs.1,500 per bag", 1500.0),
+    ("Rs. 1,500 per bag", 1500.0),
+    ("Rs.15-20 per brick", 17.5),
+    ("USD5-7", 6.0),
+    ("PKR15 per brick", 15.0),
+    ("approx.250", 250.0),
+    ("CO2 2.5 kg", 2.5),
+    ("-5", -5.0),
+    ("1.2e3", 1200.0),
+    (50, 50.0),
+    (0.25, 0.25),
+])
+def test_parse_number(value, expected):
+    assert parse_number(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", ["estimate", "n/a", "", "1.2.3", "12,34", None, True])
+def test_parse_number_unreadable_is_nan(value):
+    assert math.isnan(parse_number(value))
+
+
+def test_flatten_report_rows():
+    rows = list(flatten_report(make_report(materials=("Brick",))))
+
+    assert rows == [
+        ("Lahore", "Pakistan", "brick", "carbon_footprint", pytest.approx(0.24), None),
+        ("Lahore", "Pakistan", "brick", "carbon_rating", 7.0, None),
+        ("Lahore", "Pakistan", "brick", "estimated_price_per_unit", 15.0, "low"),
+        ("Lahore", "Pakistan", "brick", "lifespan_years", 75.0, "medium"),
+    ]
+
+
+def test_flatten_report_skips_errors():
+    report = make_report()
+    report["carbon_impact"] = {"error": "Error in CarbonAgent: timeout"}
+    report["cost_analysis"] = {"error": "Error in CostAgent: timeout"}
+
+    factors = {row[3] for row in flatten_report(report)}
+
+    assert factors == {"lifespan_years"}
+
+
+def test_flatten_report_missing_values_are_none():
+    report = make_report(city=None, country="  ", materials=("brick",))
+    report["cost_analysis"]["brick"]["relative_cost"] = None
+    del report["durability"]["brick"]["maintenance"]
+
+    for city, country, _, _, _, category in flatten_report(report):
+        assert (city, country, category) == (None, None, None)
+
+
+def test_missing_values_load_as_nan(tmp_path):
+    path = str(tmp_path / "store")
+    report = make_report(city="", country=None, materials=("brick",))
+    report["cost_analysis"]["brick"]["relative_cost"] = None
+    with ReportStore(path) as store:
+        store.append(report)
+
+    df = load_reports(path)
+    assert len(df) == 4
+    assert df[["city", "country"]].isna().all().all()
+    assert df.city.cat.categories.tolist() == []
+    assert df.country.cat.categories.tolist() == []
+    assert df.category.cat.categories.tolist() == ["medium"]
+    assert (df.category.isna() == (df.factor != "lifespan_years")).all()
+
+
+def test_round_trip_across_flushes_and_reopen(tmp_path):
+    path = str(tmp_path / "store")
+    with ReportStore(path, chunk_rows=5) as store:
+        for i in range(4):
+            store.append(make_report(city=f"City {i}"))
+    with ReportStore(path, chunk_rows=5) as store:
+        store.append(make_report(city="city 0", country="PAKISTAN", materials=("Wood",)))
+
+    df = load_reports(path)
+
+    assert len(df) == 4 * 8 + 4
+    assert df.country.cat.categories.tolist() == ["Pakistan"]
+    assert df.city.cat.categories.tolist() == ["City 0", "City 1", "City 2", "City 3"]
+    assert df.material.cat.categories.tolist() == ["brick", "steel", "wood"]
+    assert df.value.dtype == "float32"
+    carbon = df[df.factor.isin(["carbon_footprint", "carbon_rating"])]
+    assert carbon.category.isna().all()
+    assert df.category.cat.categories.tolist() == ["low", "medium"]
+
+
+def test_reopen_truncates_partial_chunk(tmp_path):
+    path = str(tmp_path / "store")
+    with ReportStore(path) as store:
+        store.append(make_report())
+    # Simulate a flush that wrote column data but died before meta.json
+    for name in COLUMNS:
+        with open(os.path.join(path, f"{name}.bin"), "ab") as f:
+            f.write(b"\x07" * 24)
+
+    with ReportStore(path) as store:
+        store.append(make_report(city="Karachi"))
+
+    df = load_reports(path)
+    assert len(df) == 16
+    assert df.city.value_counts().to_dict() == {"Lahore": 8, "Karachi": 8}
+
+
+def test_reopen_with_different_layout_raises(tmp_path):
+    path = str(tmp_path / "store")
+    ReportStore(path).close()
+    meta_path = os.path.join(path, "meta.json")
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["factors"] = meta["factors"][:2]
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+    with pytest.raises(ValueError):
+        ReportStore(path)
+
+
+def test_failed_append_leaves_columns_aligned(tmp_path):
+    path = str(tmp_path / "store")
+    with ReportStore(path) as store:
+        store.append(make_report("Lahore", materials=("brick",)))
+        # Leave room for one more int16 country code: Kenya fits, Japan overflows
+        store.dictionaries["country"].extend(f"Country {i}" for i in range(32766))
+        store.append(make_report("Nairobi", "Kenya", ("brick",)))
+        with pytest.raises(ValueError):
+            store.append(make_report("Tokyo", "Japan", ("brick",)))
+
+        assert {len(column) for column in store._buffer.values()} == {8}
+        store.append(make_report("Karachi", materials=("brick",)))
+
+    df = load_reports(path)
+    assert df.city.astype(str).value_counts().to_dict() == {"Lahore": 4, "Nairobi": 4, "Karachi": 4}
+    assert df.groupby("city", observed=True).country.first().to_dict() == {
+        "Karachi": "Pakistan", "Lahore": "Pakistan", "Nairobi": "Kenya",
+    }
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    path = str(tmp_path / "store")
+    with ReportStore(path) as store:
+        store.append(make_report("Lahore", "Pakistan", ("brick", "steel")))
+        store.append(make_report("Nairobi", "Kenya", ("steel", "wood")))
+        store.append(make_report("Berlin", "Germany", ("wood", "glass")))
+    return path
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"country": "kenya"}, 8),
+    ({"country": ["Kenya", "Germany"]}, 16),
+    ({"material": "STEEL"}, 8),
+    ({"material": ["wood", "glass"]}, 12),
+    ({"city": "Lahore"}, 8),
+    ({"factor": "lifespan_years"}, 6),
+    ({"country": "Kenya", "material": "steel"}, 4),
+    ({"country": "Kenya", "material": "glass"}, 0),
+    ({"country": "Atlantis"}, 0),
+])
+def test_load_reports_filters(store_path, filters, expected):
+    df = load_reports(store_path, **filters)
+
+    assert len(df) == expected
+    for name, wanted in filters.items():
+        wanted = [wanted] if isinstance(wanted, str) else wanted
+        assert set(df[name].str.lower()) <= {w.lower() for w in wanted}
+
+
+def test_load_reports_filters_normalise_like_store(tmp_path):
+    path = str(tmp_path / "store")
+    with ReportStore(path) as store:
+        store.append(make_report("Straße", "Germany", ("brick",)))
+        store.append(make_report("STRASSE", "Germany", ("brick",)))
+        store.append(make_report("New York", "United States", ("steel",)))
+
+    assert len(load_reports(path, city="STRASSE")) == 8
+    assert len(load_reports(path, city="straße")) == 8
+    assert len(load_reports(path, city="New  York ")) == 4
+    assert len(load_reports(path, country=" united   states")) == 4
+
+
+def test_load_reports_empty_store(tmp_path):
+    path = str(tmp_path / "store")
+    ReportStore(path).close()
+
+    df = load_reports(path, country="Pakistan")
+
+    assert len(df) == 0
+    assert list(df.columns) == list(COLUMNS)
+    assert isinstance(df.country.dtype, pd.CategoricalDtype)